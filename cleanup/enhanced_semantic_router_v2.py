@@ -13,10 +13,46 @@ including better handling of:
 """
 
 import re
+import functools
+import unicodedata
 from enum import Enum
-from typing import Dict, List, Tuple, Optional, Any
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple, Optional, Any
 from dataclasses import dataclass
 
+@functools.lru_cache(maxsize=None)
+def _compiled(pattern: str, flags: int = 0) -> "re.Pattern[str]":
+    """Compile a pattern once per (pattern, flags) pair"""
+    return re.compile(pattern, flags)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Messages longer than this (~1k tokens at ~4 chars/token) are not chat turns;
+# they skip regex matching entirely to keep worst-case cost bounded
+MAX_MESSAGE_CHARS = 4096
+
+# Intent and parameter cues sit at the start of a message, so only this many
+# leading characters are scanned
+SCAN_HEAD_CHARS = 512
+
+def _scan_head(message: str) -> str:
+    """Trim a message to its first SCAN_HEAD_CHARS, backing off to a word boundary"""
+    if len(message) <= SCAN_HEAD_CHARS:
+        return message
+    head = message[:SCAN_HEAD_CHARS]
+    if not message[SCAN_HEAD_CHARS].isspace():
+        # Don't let a cut token like "$2500" -> "$25" look like a value
+        parts = head.rsplit(None, 1)
+        head = parts[0] if parts else head
+    return head
+
+def _normalize_message(message: str) -> str:
+    """Normalize a message for matching and cache lookups"""
+    # Collapse whitespace before cutting, so padding doesn't push cues out of
+    # the scanned head; callers already cap messages at MAX_MESSAGE_CHARS
+    message = unicodedata.normalize('NFC', message.lower())
+    return _scan_head(_WHITESPACE_RE.sub(' ', message).strip())
+
 class Intent(Enum):
     SEARCH_LISTINGS = "search_listings"
     CHECK_VIOLATIONS = "check_violations"
@@ -26,21 +62,61 @@ class Intent(Enum):
     PARAMETER_REFINEMENT = "parameter_refinement"
     UNCLASSIFIED = "unclassified"
 
-@dataclass
+@dataclass(frozen=True)
 class PatternGroup:
     """Group of patterns with priority for intent classification"""
-    patterns: List[str]
+    patterns: Tuple[str, ...]
     priority: int = 1
     case_insensitive: bool = True
+    
+    def __post_init__(self):
+        # Groups are shared by every router, so keep the patterns immutable
+        object.__setattr__(self, 'patterns', tuple(self.patterns))
 
 class EnhancedSemanticRouterV2:
     """Enhanced semantic router with comprehensive pattern matching"""
     
+    # Pattern tables and intent scanners are the same for every instance, so
+    # they are built on first use and shared, read-only, through the class;
+    # the scanners are compiled from the tables and would miss any edit
+    _pattern_tables: Optional[Tuple[
+        Mapping[Intent, PatternGroup],
+        Mapping[str, Tuple[str, ...]],
+        Tuple[Tuple[Intent, "re.Pattern[str]"], ...],
+        Mapping[str, "re.Pattern[str]"],
+    ]] = None
+    
     def __init__(self):
-        self.intent_patterns = self._build_intent_patterns()
-        self.parameter_patterns = self._build_parameter_patterns()
+        (self.intent_patterns,
+         self.parameter_patterns,
+         self._intent_scanners,
+         self._parameter_scanners) = self._shared_pattern_tables()
         
-    def _build_intent_patterns(self) -> Dict[Intent, PatternGroup]:
+        # Results depend only on the normalized message, so repeated messages
+        # are answered from a per-router cache
+        self._classify_cached = functools.lru_cache(maxsize=2048)(self._classify_normalized)
+        self._extract_cached = functools.lru_cache(maxsize=2048)(self._extract_normalized)
+        
+    @classmethod
+    def _shared_pattern_tables(cls):
+        """Return the class-wide pattern tables and their combined scanners"""
+        if cls._pattern_tables is None:
+            intent_patterns = MappingProxyType(cls._build_intent_patterns())
+            parameter_patterns = MappingProxyType({
+                param_name: tuple(patterns)
+                for param_name, patterns in cls._build_parameter_patterns().items()
+            })
+            cls._pattern_tables = (
+                intent_patterns,
+                parameter_patterns,
+                # One regex scan per intent instead of one per pattern
+                tuple(cls._build_intent_scanners(intent_patterns)),
+                MappingProxyType(cls._build_parameter_scanners(parameter_patterns)),
+            )
+        return cls._pattern_tables
+    
+    @staticmethod
+    def _build_intent_patterns() -> Dict[Intent, PatternGroup]:
         """Build comprehensive intent classification patterns"""
         return {
             Intent.WHAT_IF: PatternGroup([
@@ -141,7 +217,8 @@ class EnhancedSemanticRouterV2:
             ], priority=2),
         }
     
-    def _build_parameter_patterns(self) -> Dict[str, List[str]]:
+    @staticmethod
+    def _build_parameter_patterns() -> Dict[str, List[str]]:
         """Build comprehensive parameter extraction patterns"""
         return {
             'borough': [
@@ -262,31 +339,65 @@ class EnhancedSemanticRouterV2:
     
     def classify_intent(self, message: str, context: Dict = None) -> Intent:
         """Classify message intent using comprehensive pattern matching"""
-        message_lower = message.lower()
+        if not message or len(message) > MAX_MESSAGE_CHARS:
+            return Intent.UNCLASSIFIED
+        return self._classify_cached(_normalize_message(message))
+    
+    def _classify_normalized(self, message_lower: str) -> Intent:
+        """Classify an already-normalized message"""
+        for intent, scanner in self._intent_scanners:
+            if scanner.search(message_lower):
+                return intent
         
+        return Intent.UNCLASSIFIED
+    
+    @staticmethod
+    def _build_intent_scanners(
+        intent_patterns: Mapping[Intent, PatternGroup]
+    ) -> List[Tuple[Intent, "re.Pattern[str]"]]:
+        """Combine each intent's patterns into one alternation, highest priority first"""
         # Sort intents by priority (higher priority first)
         sorted_intents = sorted(
-            self.intent_patterns.items(),
+            intent_patterns.items(),
             key=lambda x: x[1].priority,
             reverse=True
         )
         
+        scanners = []
         for intent, pattern_group in sorted_intents:
-            for pattern in pattern_group.patterns:
-                flags = re.IGNORECASE if pattern_group.case_insensitive else 0
-                if re.search(pattern, message_lower, flags):
-                    return intent
-        
-        return Intent.UNCLASSIFIED
+            flags = re.IGNORECASE if pattern_group.case_insensitive else 0
+            combined = '|'.join(f'(?:{pattern})' for pattern in pattern_group.patterns)
+            scanners.append((intent, _compiled(combined, flags)))
+        return scanners
+    
+    @staticmethod
+    def _build_parameter_scanners(
+        parameter_patterns: Mapping[str, Tuple[str, ...]]
+    ) -> Dict[str, "re.Pattern[str]"]:
+        """Combine each parameter's patterns into one alternation used as a pre-screen"""
+        return {
+            param_name: _compiled('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
+            for param_name, patterns in parameter_patterns.items()
+        }
     
     def extract_parameters(self, message: str) -> Dict[str, Any]:
         """Extract parameters using comprehensive pattern matching"""
+        if not message or len(message) > MAX_MESSAGE_CHARS:
+            return {}
+        # Copy so callers can't mutate the cached result
+        return dict(self._extract_cached(_normalize_message(message)))
+    
+    def _extract_normalized(self, message_lower: str) -> Dict[str, Any]:
+        """Extract parameters from an already-normalized message"""
         params = {}
-        message_lower = message.lower()
         
         for param_name, patterns in self.parameter_patterns.items():
+            # One scan rules out the parameter; only on a hit do the patterns
+            # run individually, in order, so the first-listed match still wins
+            if not self._parameter_scanners[param_name].search(message_lower):
+                continue
             for pattern in patterns:
-                match = re.search(pattern, message_lower, re.IGNORECASE)
+                match = _compiled(pattern, re.IGNORECASE).search(message_lower)
                 if match:
                     value = match.group(1).strip()
                     
@@ -429,12 +429,12 @@ Response:"""
         if not isinstance(reasoning, str) or not reasoning.strip():
             raise InvalidLLMResponseError("Reasoning must be a non-empty string")
     
-    def from_response(self, llm_response: str) -> RouterResponse:
+    def from_response(self, llm_response: Union[str, Dict[str, Any]]) -> RouterResponse:
         """
         Parse and validate LLM response into structured format.
         
         Args:
-            llm_response: Raw response string from LLM
+            llm_response: Raw response string from LLM, or an already-parsed dict
             
         Returns:
             RouterResponse object
@@ -443,15 +443,19 @@ Response:"""
             InvalidLLMResponseError: If response cannot be parsed or validated
         """
         try:
-            # Try to extract JSON from response (in case LLM adds extra text)
-            json_match = re.search(r'\{.*\}', llm_response.strip(), re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
+            if isinstance(llm_response, dict):
+                # Clients with structured output hand back parsed JSON already
+                response_data = llm_response
             else:
-                json_str = llm_response.strip()
-            
-            # Parse JSON
-            response_data = json.loads(json_str)
+                # Try to extract JSON from response (in case LLM adds extra text)
+                json_match = re.search(r'\{.*\}', llm_response.strip(), re.DOTALL)
+                if json_match:
+                    json_str = json_match.group(0)
+                else:
+                    json_str = llm_response.strip()
+                
+                # Parse JSON
+                response_data = json.loads(json_str)
             
             # Validate structure
             self._validate_response(response_data)
@@ -6,14 +6,20 @@ for natural language understanding in housing search conversations.
 """
 
 import re
+import functools
 import logging
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional, Tuple, Any, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=None)
+def _compiled(pattern: str, flags: int = 0) -> "re.Pattern[str]":
+    """Compile a pattern once per (pattern, flags) pair"""
+    return re.compile(pattern, flags)
+
 class Intent(Enum):
     SEARCH_LISTINGS = "search_listings"
     CHECK_VIOLATIONS = "check_violations"
@@ -34,7 +40,7 @@ class PatternGroup:
 class Parameter:
     name: str
     patterns: List[str]
-    transform: Optional[callable] = None
+    transform: Optional[Callable[[str], Any]] = None
     aliases: List[str] = field(default_factory=list)
 
 @dataclass
@@ -248,6 +254,18 @@ INTENT_PARAMETERS: Dict[Intent, List[Parameter]] = {
     ]
 }
 
+_MISSING = object()
+
+def _classify_change(old: Any, new: Any, is_borough: bool, allows_retry: bool) -> str:
+    """Return the change type for a single parameter transition"""
+    if old is _MISSING:
+        return "new"
+    if old == new:
+        if is_borough and allows_retry:
+            return "refinement"
+        return "redundant"
+    return "refinement"
+
 class ParameterAnalyzer:
     """Analyzes parameter changes between current and new parameters"""
     
@@ -257,53 +275,20 @@ class ParameterAnalyzer:
         new_params: Dict[str, Any],
         context: SearchContext
     ) -> List[ParameterChange]:
-        changes = []
+        changes: List[ParameterChange] = []
         
         for param, value in new_params.items():
-            if param not in current_params:
-                changes.append(ParameterChange(
-                    param_name=param,
-                    old_value=None,
-                    new_value=value,
-                    change_type="new"
-                ))
-            elif param == "borough":
-                if current_params[param] == value:
-                    if context.allows_borough_retry():
-                        changes.append(ParameterChange(
-                            param_name=param,
-                            old_value=current_params[param],
-                            new_value=value,
-                            change_type="refinement"
-                        ))
-                    else:
-                        changes.append(ParameterChange(
-                            param_name=param,
-                            old_value=value,
-                            new_value=value,
-                            change_type="redundant"
-                        ))
-                else:
-                    changes.append(ParameterChange(
-                        param_name=param,
-                        old_value=current_params[param],
-                        new_value=value,
-                        change_type="refinement"
-                    ))
-            elif current_params[param] == value:
-                changes.append(ParameterChange(
-                    param_name=param,
-                    old_value=value,
-                    new_value=value,
-                    change_type="redundant"
-                ))
-            else:
-                changes.append(ParameterChange(
-                    param_name=param,
-                    old_value=current_params[param],
-                    new_value=value,
-                    change_type="refinement"
-                ))
+            old = current_params.get(param, _MISSING)
+            is_borough = param == "borough"
+            # Only consult the search history when a repeated borough needs it
+            allows_retry = is_borough and old == value and context.allows_borough_retry()
+            change_type = _classify_change(old, value, is_borough, allows_retry)
+            changes.append(ParameterChange(
+                param_name=param,
+                old_value=None if old is _MISSING else old,
+                new_value=value,
+                change_type=change_type
+            ))
         
         return changes
 
@@ -312,7 +297,7 @@ class ResponseGenerator:
     
     def generate_response(self, context: ResponseContext) -> str:
         """Generate natural language response based on parameter changes"""
-        parts = []
+        parts: List[str] = []
         
         # Group changes by type
         changes_by_type = self._group_changes(context.changes)
@@ -363,7 +348,7 @@ class ResponseGenerator:
         self, 
         changes: List[ParameterChange]
     ) -> Dict[str, List[ParameterChange]]:
-        grouped = {}
+        grouped: Dict[str, List[ParameterChange]] = {}
         for change in changes:
             grouped.setdefault(change.change_type, []).append(change)
         return grouped
@@ -377,12 +362,12 @@ def classify_intent(
     Enhanced classification that considers conversation context and state.
     """
     msg = message.lower()
-    matches = []
+    matches: List[Tuple[Intent, int, str, str, bool]] = []
     
     # Check each intent's patterns
     for intent, pattern_group in INTENT_PATTERNS.items():
         for pattern in pattern_group.patterns:
-            if match := re.search(pattern, msg):
+            if match := _compiled(pattern).search(msg):
                 matches.append((
                     intent,
                     pattern_group.priority,
@@ -429,14 +414,14 @@ def extract_parameters(
     """
     Extract structured parameters based on intent.
     """
-    params = {}
+    params: Dict[str, Any] = {}
     if intent not in INTENT_PARAMETERS:
         return params
         
     for param in INTENT_PARAMETERS[intent]:
         for pattern in param.patterns:
-            if match := re.search(pattern, message, re.I):
-                value = match.group(1)
+            if match := _compiled(pattern, re.I).search(message):
+                value: Any = match.group(1)
                 if param.transform:
                     try:
                         value = param.transform(value)
@@ -450,7 +435,7 @@ def extract_parameters(
 class EnhancedSemanticRouter:
     """Main semantic router with context awareness and parameter analysis"""
     
-    def __init__(self):
+    def __init__(self) -> None:
         self.parameter_analyzer = ParameterAnalyzer()
         self.response_generator = ResponseGenerator()
         self.context: Optional[SearchContext] = None
@@ -501,12 +486,12 @@ class EnhancedSemanticRouter:
         
         return classification.intent, new_params, response
     
-    def update_search_results(self, result_count: int):
+    def update_search_results(self, result_count: int) -> None:
         """Update context with search results"""
         if self.context:
             self.context.last_result_count = result_count
     
-    def _update_context(self, new_params: Dict[str, Any]):
+    def _update_context(self, new_params: Dict[str, Any]) -> None:
         """Update search context with new parameters"""
         if self.context:
             self.context.search_history.append({
@@ -524,22 +509,22 @@ class EnhancedSemanticRouter:
         classification: ClassificationResult,
         params: Dict[str, Any],
         response: str
-    ):
+    ) -> None:
         """Log classification results for analysis"""
-        log_data = {
-            "timestamp": datetime.now().isoformat(),
-            "message": message,
-            "intent": classification.intent.value,
-            "confidence": classification.confidence,
-            "extracted_params": params,
-            "response": response
-        }
-        
-        logger.info(f"Classification: {log_data}")
+        if logger.isEnabledFor(logging.INFO):
+            log_data = {
+                "timestamp": datetime.now().isoformat(),
+                "message": message,
+                "intent": classification.intent.value,
+                "confidence": classification.confidence,
+                "extracted_params": params,
+                "response": response
+            }
+            logger.info("Classification: %s", log_data)
         
         # Log unclassified messages for pattern improvement
         if classification.intent == Intent.UNCLASSIFIED:
-            logger.warning(f"Unclassified message: {message}")
+            logger.warning("Unclassified message: %s", message)
 
 # Convenience functions for backward compatibility
 def classify_intent_with_regex(message: str) -> str:
@@ -4,7 +4,10 @@ Contact directory for human handoff scenarios.
 Maps voucher types and boroughs to specific contact information.
 """
 
-from typing import Optional, Dict
+import functools
+import re
+from types import MappingProxyType
+from typing import Optional, Dict, Mapping
 
 CONTACT_DIRECTORY = {
     "default": {
@@ -140,35 +143,42 @@ CONTACT_DIRECTORY = {
     }
 }
 
+# Spelling variations of each voucher program, keyed by the uppercase form
+# with everything but letters and digits removed
+VOUCHER_VARIATIONS = {
+    # CityFHEPS variations
+    "CITYFHEPS": "CITYFHEPS",
+    "CITYFHEP": "CITYFHEPS",
+    "FHEPS": "CITYFHEPS",
+    "FHEP": "CITYFHEPS",
+    "CFHEPS": "CITYFHEPS",
+    
+    # Section 8 variations
+    "SECTION8": "SECTION 8",
+    "SECTIONEIGHT": "SECTION 8",
+    "S8": "SECTION 8",
+    "SEC8": "SECTION 8",
+    
+    # HASA variations
+    "HASA": "HASA",
+    "HIVAIDSERVICESADMIN": "HASA",
+    "HIVAIDSERVICES": "HASA"
+}
+
+# Spaces and punctuation ("Section-8", "H.A.S.A.", "Section #8") are dropped
+# before the lookup
+_NON_ALNUM_RE = re.compile(r"[^A-Z0-9]")
+
 def normalize_voucher_type(voucher_type):
     """Normalize voucher type for consistent lookup."""
     if not voucher_type:
         return None
         
     # Convert to uppercase and remove spaces/punctuation
-    normalized = voucher_type.upper().replace(" ", "").replace("-", "").replace(".", "")
+    normalized = _NON_ALNUM_RE.sub("", voucher_type.upper())
     
     # Handle common variations
-    variations = {
-        # CityFHEPS variations
-        "CITYFHEP": "CITYFHEPS",
-        "FHEPS": "CITYFHEPS",
-        "FHEP": "CITYFHEPS",
-        "CFHEPS": "CITYFHEPS",
-        
-        # Section 8 variations
-        "SECTION8": "SECTION 8",
-        "SECTIONEIGHT": "SECTION 8",
-        "S8": "SECTION 8",
-        "SEC8": "SECTION 8",
-        
-        # HASA variations
-        "HASA": "HASA",
-        "HIVAIDSERVICESADMIN": "HASA",
-        "HIVAIDSERVICES": "HASA"
-    }
-    
-    return variations.get(normalized, normalized)
+    return VOUCHER_VARIATIONS.get(normalized, normalized)
 
 def get_contact_info(voucher_type: Optional[str] = None, borough: Optional[str] = None, is_discrimination: bool = False, use_borough_office: bool = False) -> Dict[str, str]:
     """
@@ -181,14 +191,25 @@ def get_contact_info(voucher_type: Optional[str] = None, borough: Optional[str]
         use_borough_office: Whether to force using borough-specific office for discrimination cases
         
     Returns:
-        Dict containing contact information
+        Dict containing contact information; a fresh copy the caller may modify
     """
-    # Normalize inputs
-    if voucher_type:
-        voucher_type = voucher_type.upper()
+    # Normalize inputs so spelling variants share one cache entry
+    voucher_type = normalize_voucher_type(voucher_type)
     if borough:
         borough = borough.lower().replace(" ", "_")
     
+    # The cached entry is shared, but handoff results are JSON-serialized and
+    # edited by callers, so each call gets its own copy; the proxy's copy()
+    # duplicates the underlying dict directly and is much cheaper than dict()
+    return _lookup_contact_info(voucher_type, borough or None, is_discrimination, use_borough_office).copy()
+
+@functools.lru_cache(maxsize=256)
+def _lookup_contact_info(voucher_type: Optional[str], borough: Optional[str], is_discrimination: bool, use_borough_office: bool) -> Mapping[str, str]:
+    """Cached lookup on normalized inputs; the result is shared, so it is read-only"""
+    return MappingProxyType(_find_contact_info(voucher_type, borough, is_discrimination, use_borough_office))
+
+def _find_contact_info(voucher_type: Optional[str], borough: Optional[str], is_discrimination: bool, use_borough_office: bool) -> Dict[str, str]:
+    """Resolve the contact entry for already-normalized inputs"""
     # For discrimination cases, route to appropriate office
     if is_discrimination:
         # HASA discrimination cases go to Housing Works Legal Team
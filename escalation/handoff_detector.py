@@ -4,67 +4,394 @@ Human handoff detection module for VoucherBot.
 Detects when a conversation should be escalated to a human caseworker.
 """
 
+import functools
+import itertools
+import logging
 import re
-from typing import Dict, Tuple, Optional
+import unicodedata
+from typing import Callable, Dict, FrozenSet, List, Mapping, Sequence, Tuple, Optional, Union
 from .contact_directory import get_contact_info
 
+try:
+    import ahocorasick
+except ImportError:  # optional; plain substring checks are used instead
+    ahocorasick = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # optional; the semantic fallback is disabled instead
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+# User-driven trigger patterns
+USER_REQUEST_PATTERNS = [
+    # Direct requests
+    r"(?i)^.*?(can|could|may|how\s+do|how\s+can)\s+(i|we|you)?\s*(speak|talk|get|connect|reach|contact)\s*(to|with|through)?\s*(someone|anybody|a?\s*person|a?\s*caseworker|a?\s*specialist|a?\s*counselor|a?\s*agent|a?\s*housing\s*specialist)",
+    r"(?i)^.*?(need|want|would\s*like|trying)\s*(to)?\s*(speak|talk|get|connect|reach|contact)\s*(to|with|through)?\s*(someone|anybody|a?\s*person|a?\s*caseworker|a?\s*specialist|a?\s*counselor|a?\s*agent|a?\s*housing\s*specialist)",
+    r"(?i)^.*?(connect|put|get)\s*(me|us|in\s*touch|through)\s*(with|to)?\s*(someone|anybody|a?\s*person|a?\s*caseworker|a?\s*specialist|a?\s*counselor|a?\s*agent|a?\s*housing\s*specialist)",
+    r"(?i)^.*?(is\s*there)?\s*(someone|anybody|a?\s*person|a?\s*caseworker|a?\s*specialist|a?\s*counselor|a?\s*agent|a?\s*housing\s*specialist)\s*(i|we|to)?\s*(can)?\s*(speak|talk|contact|meet)",
+    r"(?i)^.*?(how|where|who)\s*(do|can|should)\s*(i|we)?\s*(get|speak|talk|contact|connect|reach|find|meet)",
+    r"(?i)^.*?(need|want)\s*(help|assistance)\s*(with|understanding|about|regarding|for)\s*(my|the)?\s*(rights|options|voucher|application)",
+    
+    # Indirect requests
+    r"(?i)^.*?(would|could)\s+it\s+be\s+possible\s+to\s+(speak|talk)\s+(to|with)\s+(someone|anybody|a\s+person|a\s+caseworker|a\s+specialist)",
+    r"(?i)^.*?(need|want)\s+(help|assistance)\s+(understanding|with|about|regarding)",
+    r"(?i)^.*?(having|got)\s+(trouble|problems|issues|difficulty)\s+with\s+(my|the)\s+(application|paperwork|forms)",
+    r"(?i)^.*?(need|want)\s+to\s+(speak|talk)\s+to\s+someone\s+about\s+(my|the)\s+(application|paperwork|forms|voucher|options|rights)",
+    
+    # Rights and understanding
+    r"(?i)^.*?(understand|know)\s+(my|the)\s+(rights|options)",
+    r"(?i)^.*?what\s+(are|about)\s+(my|the)\s+(rights|options)",
+    r"(?i)^.*?(need|want)\s+(help|assistance)\s+understanding\s+(my|the)\s+(rights|options)"
+]
+
+# Case-based trigger patterns
+CASE_BASED_PATTERNS = [
+    # Direct discrimination
+    r"(?i)^.*?(landlords?|owners?|brokers?|agents?|they|management|building)\s+(won't|will\s+not|refuses?|denied|denying|declined|declining|stopped|won't|wont)\s+(to\s+)?(take|accept|consider|allow|process|approve)\s+(my\s+)?(vouchers?|section\s*8|cityfheps|hasa|applications?)",
+    r"(?i)^.*?(said|told|mentioned|implied)\s+(they|he|she|we)?\s*(don't|doesn't|do\s+not|does\s+not|won't|will\s+not)\s+(take|accept|allow|consider)\s+(vouchers?|section\s*8|cityfheps|hasa)",
+    r"(?i)^.*?(no|not)\s+(accepting|taking|allowing)\s+(vouchers?|section\s*8|cityfheps|hasa)",
+    r"(?i)^.*?broker\s+told\s+me\s+.*?(not|no)\s+(allowed|permitted|accepted)",
+    r"(?i)^.*?management\s+company\s+refuses\s+.*?clients",
+    
+    # Indirect discrimination
+    r"(?i)^.*?(every\s+time|whenever|after|when)\s+.*?(mention|say|tell|bring\s+up).*?(voucher|section\s*8|cityfheps|hasa).*?(no\s+longer|rented|taken|gone|unavailable|different)",
+    r"(?i)^.*?(stop(ped)?|quit|cease|won't|don't)\s+(respond|answer|reply|call|contact|get\s+back)",
+    r"(?i)^.*?(prefer|want|looking\s+for|only\s+accept)\s+(working|employed|professionals|people\s+with\s+jobs)",
+    r"(?i)^.*?(suddenly|keeps?|always)\s+(unavailable|gone|taken|changed|different)",
+    r"(?i)^.*?(unit|apartment|place)\s+(was|is|got)\s+(just|recently|suddenly)\s+(rented|taken|unavailable)",
+    
+    # Implicit/incomplete discrimination patterns
+    r"(?i)^.*?landlord.*?(?:\.{3}|\.\.\.).*?(voucher|section\s*8|cityfheps|hasa)",
+    r"(?i)^.*?(voucher|section\s*8|cityfheps|hasa).*?(?:\.{3}|\.\.\.).*?landlord",
+    r"(?i)^.*?(?:\.{3}|\.\.\.).*?(mention|say|tell).*?(voucher|section\s*8|cityfheps|hasa).*?(?:\.{3}|\.\.\.)$",
+    r"(?i)^.*?(when|after).*?(voucher|section\s*8|cityfheps|hasa).*?(?:\.{3}|\.\.\.)$",
+    
+    # HASA-specific discrimination
+    r"(?i)^.*?(refuses?|won't|will\s+not|don't|do\s+not)\s+(accept|take|allow|consider)\s+hasa\s+(clients|recipients|vouchers?)",
+    r"(?i)^.*?(discriminat\w+|bias\w*)\s+.*\s+hasa",
+    
+    # General discrimination indicators
+    r"(?i)^.*?(discriminat\w+|bias\w*)\s+.*\s+(vouchers?|section\s*8|cityfheps|housing)",
+    r"(?i)^.*?(illegal(ly)?|against\s+the\s+law)\s+.*\s+(reject\w*|refus\w*|deny\w*)\s+.*\s+(vouchers?|section\s*8|cityfheps|hasa)",
+    r"(?i)^.*?(treated\s+differently|unfair\w*)\s+.*\s+because\s+of\s+(my\s+)?(vouchers?|section\s*8|cityfheps|hasa)"
+]
+
+# Explicit requests to file or report a discrimination complaint
+COMPLAINT_PATTERNS = [
+    r"(?i)^.*?(file|report|make|submit|lodge)\s+.*?(complaint|report)\s+.*?(discrimination|unfair|illegal)",
+    r"(?i)^.*?(complain|report)\s+.*?(discrimination|unfair treatment|illegal)",
+    r"(?i)^.*?(help|assist).*?(file|report|make).*?(complaint|discrimination)"
+]
+
+def _combine(patterns):
+    """Compile a list of (?i) patterns into one alternation over lowercased text"""
+    # The patterns are all lowercase, so matching them against the already
+    # lowercased message makes the (?i) flag unnecessary
+    return re.compile(
+        '|'.join(f"(?:{pattern.replace('(?i)', '', 1)})" for pattern in patterns)
+    )
+
+# Each category is only ever tested for "does any pattern match", so one
+# compiled alternation per category replaces a re.search per pattern
+_USER_REQUEST_RE = _combine(USER_REQUEST_PATTERNS)
+_CASE_BASED_RE = _combine(CASE_BASED_PATTERNS)
+_COMPLAINT_RE = _combine(COMPLAINT_PATTERNS)
+
+# Plain substring triggers, matched against the lowercased message
+COMPLAINT_KEYWORDS = [
+    'discrimination complaint', 'file complaint', 'report discrimination',
+    'housing discrimination', 'voucher discrimination', 'illegal discrimination',
+    'file.*discrimination', 'report.*discrimination', 'complain.*discrimination',
+    'complaint about discrimination', 'discrimination.*complaint'
+]
+
+RIGHTS_ASSISTANCE_KEYWORDS = [
+    'understand my rights', 'know my rights', 'understand my options',
+    'know my options', 'what are my rights', 'what options do i have',
+    'help understanding my rights', 'help with my rights',
+    'explain my rights', 'learn about my rights'
+]
+
+SEARCH_WORDS = ['find', 'search', 'looking', 'show', 'list']
+
+# Phrases that make a search-related message a clear request for a human
+HUMAN_ASSISTANCE_PHRASES = [
+    'talk to', 'speak with', 'need someone', 'talk with', 'speak to',
+    'human', 'person', 'caseworker', 'agent', 'staff', 'specialist',
+    'having trouble', 'need help with', 'assistance with'
+]
+
+DISCRIMINATION_KEYWORDS = [
+    'discrimination', 'illegal', 'unfair', 'bias',
+    'won\'t take', 'don\'t accept', 'refuse', 'denied',
+    'no longer available when', 'stop responding when', 'prefer working professionals',
+    'against the law', 'treated differently'
+]
+
+ASSISTANCE_KEYWORDS = [
+    'help with', 'assistance with', 'having trouble with', 'need help with',
+    'having difficulty with', 'problems with', 'issues with', 'speak with',
+    'talk to someone', 'contact someone', 'get in touch', 'caseworker',
+    'specialist', 'advisor', 'counselor', 'need to speak', 'need to talk',
+    'how do i get in touch', 'how can i speak', 'how can i talk',
+    'housing specialist', 'need assistance with'
+]
+# Requests for a human in other languages, compared after NFKC normalization
+# and case folding
+MULTILINGUAL_HANDOFF_PHRASES = [
+    'necesito hablar con alguien',
+    '需要人工帮助',
+    "besoin de parler à quelqu'un",
+    'нужна помощь человека',
+    'مساعدة من شخص حقيقي'
+]
+
+
+# Literals at least one of which every pattern in the matching list above
+# requires; a message containing none of them can skip that regex.
+# Keep in sync when adding patterns.
+USER_REQUEST_ANCHORS = [
+    'speak', 'talk', 'get', 'connect', 'reach', 'contact', 'put', 'meet',
+    'find', 'help', 'assistance', 'trouble', 'problems', 'issues',
+    'difficulty', 'rights', 'options'
+]
+
+CASE_BASED_ANCHORS = [
+    'voucher', 'section', 'cityfheps', 'hasa', 'application', 'housing',
+    'broker', 'management', 'respond', 'answer', 'reply', 'call', 'working',
+    'employed', 'professionals', 'people', 'unavailable', 'gone', 'taken',
+    'changed', 'different', 'rented', 'contact', 'get'
+]
+
+COMPLAINT_ANCHORS = ['complain', 'report', 'discrimination']
+
+PATTERN_ANCHORS = USER_REQUEST_ANCHORS + CASE_BASED_ANCHORS + COMPLAINT_ANCHORS
+
+
+def _fold(text: str) -> str:
+    """NFKC-normalize and case-fold text; ASCII text only needs lowercasing"""
+    if text.isascii():
+        return text.lower()
+    return unicodedata.normalize('NFKC', text).casefold()
+
+
+# Word tokens of a lowercased message, for single-word trigger lookups
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class _KeywordMatcher:
+    """Finds any of a fixed set of phrases in a string."""
+
+    def __init__(self, phrases):
+        self.phrases = tuple(phrases)
+        # A single-word phrase that is also a whole token of the message is a
+        # guaranteed substring hit, so those are checked by hash lookup first
+        self._words = frozenset(phrase for phrase in self.phrases if _TOKEN_RE.fullmatch(phrase))
+        self._automaton = None
+        if ahocorasick is not None:
+            # One automaton for all phrases: a message is scanned once
+            # however many phrases there are
+            self._automaton = ahocorasick.Automaton()
+            for phrase in self.phrases:
+                self._automaton.add_word(phrase, phrase)
+            self._automaton.make_automaton()
+
+    def search(self, text: str, tokens: FrozenSet[str] = frozenset()) -> Optional[str]:
+        """Return a phrase found in text, or None; tokens are text's word tokens"""
+        for word in self._words.intersection(tokens):
+            return word
+        # No whole-word hit; phrases can still match inside words ("personal")
+        if self._automaton is not None:
+            for _, phrase in self._automaton.iter(text):
+                return phrase
+            return None
+        for phrase in self.phrases:
+            if phrase in text:
+                return phrase
+        return None
+
+
+_COMPLAINT_KEYWORDS = _KeywordMatcher(COMPLAINT_KEYWORDS)
+_RIGHTS_ASSISTANCE_KEYWORDS = _KeywordMatcher(RIGHTS_ASSISTANCE_KEYWORDS)
+_SEARCH_WORDS = _KeywordMatcher(SEARCH_WORDS)
+_HUMAN_ASSISTANCE_PHRASES = _KeywordMatcher(HUMAN_ASSISTANCE_PHRASES)
+_DISCRIMINATION_KEYWORDS = _KeywordMatcher(DISCRIMINATION_KEYWORDS)
+_ASSISTANCE_KEYWORDS = _KeywordMatcher(ASSISTANCE_KEYWORDS)
+_MULTILINGUAL_HANDOFF_PHRASES = _KeywordMatcher(_fold(phrase) for phrase in MULTILINGUAL_HANDOFF_PHRASES)
+_USER_REQUEST_ANCHORS = _KeywordMatcher(USER_REQUEST_ANCHORS)
+_CASE_BASED_ANCHORS = _KeywordMatcher(CASE_BASED_ANCHORS)
+_COMPLAINT_ANCHORS = _KeywordMatcher(COMPLAINT_ANCHORS)
+
+# Cheap first stage: plain searches usually contain no trigger at all, and
+# one scan for these literals rejects them before any regex runs
+_HANDOFF_FINGERPRINT = _KeywordMatcher(
+    PATTERN_ANCHORS + COMPLAINT_KEYWORDS + RIGHTS_ASSISTANCE_KEYWORDS + DISCRIMINATION_KEYWORDS +
+    list(_MULTILINGUAL_HANDOFF_PHRASES.phrases)
+)
+
+
+class _KeywordScan:
+    """Finds which of several keyword matchers occur in a string."""
+
+    def __init__(self, matchers):
+        self._automaton = None
+        if ahocorasick is not None:
+            # Each phrase carries every matcher it belongs to, so one pass
+            # over the message answers all of them
+            owners = {}
+            for matcher in matchers:
+                for phrase in matcher.phrases:
+                    owners.setdefault(phrase, set()).add(matcher)
+            self._automaton = ahocorasick.Automaton()
+            for phrase, phrase_owners in owners.items():
+                self._automaton.add_word(phrase, frozenset(phrase_owners))
+            self._automaton.make_automaton()
+
+    def scan(self, text: str, tokens: FrozenSet[str] = frozenset()) -> Callable[["_KeywordMatcher"], bool]:
+        """Return a test for whether a matcher's phrases occur in text"""
+        if self._automaton is None:
+            # Without the automaton each matcher is searched only when asked
+            return lambda matcher: matcher.search(text, tokens) is not None
+        found = set()
+        for _, phrase_owners in self._automaton.iter(text):
+            found |= phrase_owners
+        return found.__contains__
+
+
+# All matchers applied to the lowercased message; the multilingual phrases
+# are matched against the folded message instead
+_KEYWORD_SCAN = _KeywordScan((
+    _HANDOFF_FINGERPRINT, _COMPLAINT_KEYWORDS, _COMPLAINT_ANCHORS,
+    _RIGHTS_ASSISTANCE_KEYWORDS, _USER_REQUEST_ANCHORS, _SEARCH_WORDS,
+    _HUMAN_ASSISTANCE_PHRASES, _DISCRIMINATION_KEYWORDS, _CASE_BASED_ANCHORS,
+    _ASSISTANCE_KEYWORDS
+))
+
+
+# Canonical phrasings for the optional semantic fallback, by handoff reason.
+# Messages no keyword or pattern matched are compared against these.
+SEMANTIC_ANCHOR_PHRASES = {
+    "user_request": [
+        "I want to talk to a real person",
+        "I need a caseworker to help me with my case",
+        "this is too confusing, can someone help me",
+        "I'm getting nowhere with this",
+        "nothing is working and I'm frustrated"
+    ],
+    "discrimination_case": [
+        "the landlord keeps making excuses once I mention my voucher",
+        "they won't rent to me because I have a voucher",
+        "the broker stopped answering after I said section 8",
+        "the apartment was suddenly taken when they heard about my voucher"
+    ]
+}
+
+SEMANTIC_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+SEMANTIC_THRESHOLD = 0.6
+
+
+class _SemanticMatcher:
+    """Matches a message to the closest anchor phrase by embedding similarity."""
+
+    def __init__(self, model_name: str = SEMANTIC_MODEL_NAME, threshold: float = SEMANTIC_THRESHOLD):
+        self.model_name = model_name
+        self.threshold = threshold
+        self._model = None
+        self._anchors = None
+        self._reasons = [
+            reason for reason, phrases in SEMANTIC_ANCHOR_PHRASES.items() for _ in phrases
+        ]
+        # Repeated messages skip the model entirely
+        self.classify = functools.lru_cache(maxsize=4096)(self._classify)
+
+    def _load(self):
+        """Load the model and embed the anchor phrases on first use"""
+        self._model = SentenceTransformer(self.model_name)
+        phrases = [phrase for phrases in SEMANTIC_ANCHOR_PHRASES.values() for phrase in phrases]
+        self._anchors = self._model.encode(phrases, normalize_embeddings=True)
+
+    def _classify(self, message_lower: str) -> Optional[str]:
+        """Return the reason of the closest anchor, or None below the threshold"""
+        if self._model is None:
+            self._load()
+        query = self._model.encode(message_lower, normalize_embeddings=True)
+        # Embeddings are unit length, so the dot product is cosine similarity
+        similarities = self._anchors @ query
+        best = int(similarities.argmax())
+        if similarities[best] < self.threshold:
+            return None
+        return self._reasons[best]
+
+
+# Handoff message templates by trigger reason, filled from the contact info
+_HANDOFF_TEMPLATES = {
+    "user_request": """
+I understand you'd like to speak with a human caseworker. I'm happy to connect you with the right person.
+
+**{name}**
+Phone: {phone}
+Email: {email}
+Address: {address}
+Hours: {hours}
+
+I'm still here if you need help drafting a message or have other questions about your housing search.
+""".strip(),
+    "discrimination_case": """
+I notice you may be experiencing housing discrimination, which is illegal in NYC. You should speak with a housing specialist right away.
+
+**{name}**
+Phone: {phone}
+Email: {email}
+Address: {address}
+Hours: {hours}
+
+Additionally, you can report housing discrimination:
+- NYC Commission on Human Rights: 212-416-0197
+- NYS Division of Human Rights: 1-888-392-3644
+
+I'm here if you need help documenting what happened or have other questions.
+""".strip()
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _format_handoff_message(reason: str, name: str, phone: str, email: str, address: str, hours: str) -> str:
+    """Fill in a handoff template; there are only a few dozen contacts, so results are cached"""
+    return _HANDOFF_TEMPLATES[reason].format(
+        name=name, phone=phone, email=email, address=address, hours=hours
+    )
+
+
+# Metadata attached to every handoff response; final_answer hands out copies
+_HANDOFF_METADATA = {
+    "requires_human_handoff": True,
+    "handoff_type": "caseworker",
+    "timestamp": None  # You can add timestamp if needed
+}
+
+
 class HandoffDetector:
     """Detects when a conversation should be escalated to a human."""
     
-    def __init__(self):
-        # User-driven trigger patterns
-        self.user_request_patterns = [
-            # Direct requests
-            r"(?i)^.*?(can|could|may|how\s+do|how\s+can)\s+(i|we|you)?\s*(speak|talk|get|connect|reach|contact)\s*(to|with|through)?\s*(someone|anybody|a?\s*person|a?\s*caseworker|a?\s*specialist|a?\s*counselor|a?\s*agent|a?\s*housing\s*specialist)",
-            r"(?i)^.*?(need|want|would\s*like|trying)\s*(to)?\s*(speak|talk|get|connect|reach|contact)\s*(to|with|through)?\s*(someone|anybody|a?\s*person|a?\s*caseworker|a?\s*specialist|a?\s*counselor|a?\s*agent|a?\s*housing\s*specialist)",
-            r"(?i)^.*?(connect|put|get)\s*(me|us|in\s*touch|through)\s*(with|to)?\s*(someone|anybody|a?\s*person|a?\s*caseworker|a?\s*specialist|a?\s*counselor|a?\s*agent|a?\s*housing\s*specialist)",
-            r"(?i)^.*?(is\s*there)?\s*(someone|anybody|a?\s*person|a?\s*caseworker|a?\s*specialist|a?\s*counselor|a?\s*agent|a?\s*housing\s*specialist)\s*(i|we|to)?\s*(can)?\s*(speak|talk|contact|meet)",
-            r"(?i)^.*?(how|where|who)\s*(do|can|should)\s*(i|we)?\s*(get|speak|talk|contact|connect|reach|find|meet)",
-            r"(?i)^.*?(need|want)\s*(help|assistance)\s*(with|understanding|about|regarding|for)\s*(my|the)?\s*(rights|options|voucher|application)",
-            
-            # Indirect requests
-            r"(?i)^.*?(would|could)\s+it\s+be\s+possible\s+to\s+(speak|talk)\s+(to|with)\s+(someone|anybody|a\s+person|a\s+caseworker|a\s+specialist)",
-            r"(?i)^.*?(need|want)\s+(help|assistance)\s+(understanding|with|about|regarding)",
-            r"(?i)^.*?(having|got)\s+(trouble|problems|issues|difficulty)\s+with\s+(my|the)\s+(application|paperwork|forms)",
-            r"(?i)^.*?(need|want)\s+to\s+(speak|talk)\s+to\s+someone\s+about\s+(my|the)\s+(application|paperwork|forms|voucher|options|rights)",
-            
-            # Rights and understanding
-            r"(?i)^.*?(understand|know)\s+(my|the)\s+(rights|options)",
-            r"(?i)^.*?what\s+(are|about)\s+(my|the)\s+(rights|options)",
-            r"(?i)^.*?(need|want)\s+(help|assistance)\s+understanding\s+(my|the)\s+(rights|options)"
-        ]
-        
-        # Case-based trigger patterns
-        self.case_based_patterns = [
-            # Direct discrimination
-            r"(?i)^.*?(landlords?|owners?|brokers?|agents?|they|management|building)\s+(won't|will\s+not|refuses?|denied|denying|declined|declining|stopped|won't|wont)\s+(to\s+)?(take|accept|consider|allow|process|approve)\s+(my\s+)?(vouchers?|section\s*8|cityfheps|hasa|applications?)",
-            r"(?i)^.*?(said|told|mentioned|implied)\s+(they|he|she|we)?\s*(don't|doesn't|do\s+not|does\s+not|won't|will\s+not)\s+(take|accept|allow|consider)\s+(vouchers?|section\s*8|cityfheps|hasa)",
-            r"(?i)^.*?(no|not)\s+(accepting|taking|allowing)\s+(vouchers?|section\s*8|cityfheps|hasa)",
-            r"(?i)^.*?broker\s+told\s+me\s+.*?(not|no)\s+(allowed|permitted|accepted)",
-            r"(?i)^.*?management\s+company\s+refuses\s+.*?clients",
-            
-            # Indirect discrimination
-            r"(?i)^.*?(every\s+time|whenever|after|when)\s+.*?(mention|say|tell|bring\s+up).*?(voucher|section\s*8|cityfheps|hasa).*?(no\s+longer|rented|taken|gone|unavailable|different)",
-            r"(?i)^.*?(stop(ped)?|quit|cease|won't|don't)\s+(respond|answer|reply|call|contact|get\s+back)",
-            r"(?i)^.*?(prefer|want|looking\s+for|only\s+accept)\s+(working|employed|professionals|people\s+with\s+jobs)",
-            r"(?i)^.*?(suddenly|keeps?|always)\s+(unavailable|gone|taken|changed|different)",
-            r"(?i)^.*?(unit|apartment|place)\s+(was|is|got)\s+(just|recently|suddenly)\s+(rented|taken|unavailable)",
-            
-            # Implicit/incomplete discrimination patterns
-            r"(?i)^.*?landlord.*?(?:\.{3}|\.\.\.).*?(voucher|section\s*8|cityfheps|hasa)",
-            r"(?i)^.*?(voucher|section\s*8|cityfheps|hasa).*?(?:\.{3}|\.\.\.).*?landlord",
-            r"(?i)^.*?(?:\.{3}|\.\.\.).*?(mention|say|tell).*?(voucher|section\s*8|cityfheps|hasa).*?(?:\.{3}|\.\.\.)$",
-            r"(?i)^.*?(when|after).*?(voucher|section\s*8|cityfheps|hasa).*?(?:\.{3}|\.\.\.)$",
-            
-            # HASA-specific discrimination
-            r"(?i)^.*?(refuses?|won't|will\s+not|don't|do\s+not)\s+(accept|take|allow|consider)\s+hasa\s+(clients|recipients|vouchers?)",
-            r"(?i)^.*?(discriminat\w+|bias\w*)\s+.*\s+hasa",
-            
-            # General discrimination indicators
-            r"(?i)^.*?(discriminat\w+|bias\w*)\s+.*\s+(vouchers?|section\s*8|cityfheps|housing)",
-            r"(?i)^.*?(illegal(ly)?|against\s+the\s+law)\s+.*\s+(reject\w*|refus\w*|deny\w*)\s+.*\s+(vouchers?|section\s*8|cityfheps|hasa)",
-            r"(?i)^.*?(treated\s+differently|unfair\w*)\s+.*\s+because\s+of\s+(my\s+)?(vouchers?|section\s*8|cityfheps|hasa)"
-        ]
+    def __init__(self, semantic_fallback: bool = False):
+        """
+        Args:
+            semantic_fallback: Compare messages no keyword or pattern matched
+                against SEMANTIC_ANCHOR_PHRASES by sentence embedding. Needs
+                the optional sentence-transformers package; without it, or if
+                the model fails to load, a warning is logged and the fallback
+                stays disabled.
+        """
+        self.user_request_patterns = USER_REQUEST_PATTERNS
+        self.case_based_patterns = CASE_BASED_PATTERNS
+        self._semantic = None
+        if semantic_fallback:
+            if SentenceTransformer is None:
+                logger.warning("Semantic handoff fallback requested but sentence-transformers is not installed; using keyword detection only")
+            else:
+                self._semantic = _SemanticMatcher()
 
     def detect_handoff(self, message: str, context: Dict) -> Tuple[bool, Optional[str], Optional[Dict]]:
         """
@@ -84,170 +411,142 @@ class HandoffDetector:
         message = message.strip()
         if not message:
             return False, None, None
+        return self._classify(message.lower(), context)
 
-        # First check for explicit discrimination complaints
-        discrimination_complaint_keywords = [
-            'discrimination complaint', 'file complaint', 'report discrimination',
-            'housing discrimination', 'voucher discrimination', 'illegal discrimination',
-            'file.*discrimination', 'report.*discrimination', 'complain.*discrimination',
-            'complaint about discrimination', 'discrimination.*complaint'
-        ]
+    def detect_handoff_batch(self, messages: List[str], context: Union[Dict, Sequence[Dict]]) -> List[Tuple[bool, Optional[str], Optional[Dict]]]:
+        """
+        Run detect_handoff over several messages.
         
-        # Use regex for more flexible complaint matching
-        complaint_patterns = [
-            r"(?i)^.*?(file|report|make|submit|lodge)\s+.*?(complaint|report)\s+.*?(discrimination|unfair|illegal)",
-            r"(?i)^.*?(complain|report)\s+.*?(discrimination|unfair treatment|illegal)",
-            r"(?i)^.*?(help|assist).*?(file|report|make).*?(complaint|discrimination)"
+        Args:
+            messages: The user's messages
+            context: Dict containing user context (voucher type, etc.) shared
+                by every message, or one such Dict per message
+            
+        Returns:
+            One detect_handoff result tuple per message, in order
+        """
+        contexts = itertools.repeat(context) if isinstance(context, Mapping) else context
+        lowered = [message.strip().lower() for message in messages]
+        classify = self._classify
+        return [
+            classify(message_lower, message_context) if message_lower else (False, None, None)
+            for message_lower, message_context in zip(lowered, contexts)
         ]
+
+    def check_only(self, messages: List[str]) -> List[bool]:
+        """
+        Decide which messages need a human handoff, without looking up contacts.
         
-        if (any(keyword in message.lower() for keyword in discrimination_complaint_keywords) or
-            any(re.search(pattern, message) for pattern in complaint_patterns)):
-            contact_info = get_contact_info(
-                voucher_type=context.get('voucher_type'),
-                borough=context.get('borough'),
-                is_discrimination=True,
-                use_borough_office=True
-            )
-            return True, "discrimination_case", contact_info
+        The decision never depends on the user's context, so none is taken.
+        
+        Args:
+            messages: The user's messages
+            
+        Returns:
+            Whether detect_handoff would return True, for each message in order
+        """
+        reason = self._reason
+        lowered = [message.strip().lower() for message in messages]
+        return [bool(message_lower) and reason(message_lower) is not None for message_lower in lowered]
+
+    def _classify(self, message_lower: str, context: Dict) -> Tuple[bool, Optional[str], Optional[Dict]]:
+        """Classify a stripped, lowercased, non-empty message"""
+        reason = self._reason(message_lower)
+        if reason is None:
+            return False, None, None
+        # Discrimination cases go to the borough office when there is one
+        is_discrimination = reason == "discrimination_case"
+        contact_info = get_contact_info(
+            voucher_type=context.get('voucher_type'),
+            borough=context.get('borough'),
+            is_discrimination=is_discrimination,
+            use_borough_office=is_discrimination
+        )
+        return True, reason, contact_info
+
+    def _reason(self, message_lower: str) -> Optional[str]:
+        """The handoff reason for a stripped, lowercased, non-empty message, or None"""
+        tokens = frozenset(_TOKEN_RE.findall(message_lower))
+        found = _KEYWORD_SCAN.scan(message_lower, tokens)
+
+        # ASCII messages without any trigger literal can't match below; other
+        # messages are folded differently for the multilingual check
+        if message_lower.isascii() and not found(_HANDOFF_FINGERPRINT):
+            return self._semantic_reason(message_lower)
+
+        # First check for explicit discrimination complaints, with regex for
+        # more flexible complaint matching
+        if (found(_COMPLAINT_KEYWORDS) or
+            (found(_COMPLAINT_ANCHORS) and
+             _COMPLAINT_RE.search(message_lower))):
+            return "discrimination_case"
 
         # Then check for rights assistance requests
-        rights_assistance = [
-            'understand my rights', 'know my rights', 'understand my options',
-            'know my options', 'what are my rights', 'what options do i have',
-            'help understanding my rights', 'help with my rights',
-            'explain my rights', 'learn about my rights'
-        ]
-        if any(keyword in message.lower() for keyword in rights_assistance):
-            contact_info = get_contact_info(
-                voucher_type=context.get('voucher_type'),
-                borough=context.get('borough')
-            )
-            return True, "user_request", contact_info
-
-        # Then check for direct assistance requests
-        for pattern in self.user_request_patterns:
-            if re.search(pattern, message):
-                # Don't trigger on search-related help unless it's a clear request for human assistance
-                if any(word in message.lower() for word in ['find', 'search', 'looking', 'show', 'list']):
-                    # Only trigger if there's a clear request for human assistance
-                    if any(phrase in message.lower() for phrase in [
-                        'talk to', 'speak with', 'need someone', 'talk with', 'speak to',
-                        'human', 'person', 'caseworker', 'agent', 'staff', 'specialist',
-                        'having trouble', 'need help with', 'assistance with'
-                    ]):
-                        contact_info = get_contact_info(
-                            voucher_type=context.get('voucher_type'),
-                            borough=context.get('borough')
-                        )
-                        return True, "user_request", contact_info
-                else:
-                    contact_info = get_contact_info(
-                        voucher_type=context.get('voucher_type'),
-                        borough=context.get('borough')
-                    )
-                    return True, "user_request", contact_info
+        if found(_RIGHTS_ASSISTANCE_KEYWORDS):
+            return "user_request"
+
+        # Then check for requests for a human in other languages
+        if _MULTILINGUAL_HANDOFF_PHRASES.search(_fold(message_lower)):
+            return "user_request"
+
+        # Then check for direct assistance requests; the anchor scan is much
+        # cheaper than the regex and rules most other messages out
+        if (found(_USER_REQUEST_ANCHORS) and
+                _USER_REQUEST_RE.search(message_lower)):
+            # Don't trigger on search-related help unless it's a clear request for human assistance
+            if found(_SEARCH_WORDS):
+                # Only trigger if there's a clear request for human assistance
+                if found(_HUMAN_ASSISTANCE_PHRASES):
+                    return "user_request"
+            else:
+                return "user_request"
 
         # Then check for other discrimination indicators
-        discrimination_keywords = [
-            'discrimination', 'illegal', 'unfair', 'bias',
-            'won\'t take', 'don\'t accept', 'refuse', 'denied',
-            'no longer available when', 'stop responding when', 'prefer working professionals',
-            'against the law', 'treated differently'
-        ]
-        if any(keyword in message.lower() for keyword in discrimination_keywords):
-            contact_info = get_contact_info(
-                voucher_type=context.get('voucher_type'),
-                borough=context.get('borough'),
-                is_discrimination=True,
-                use_borough_office=True
-            )
-            return True, "discrimination_case", contact_info
+        if found(_DISCRIMINATION_KEYWORDS):
+            return "discrimination_case"
 
         # Check case-based patterns
-        for pattern in self.case_based_patterns:
-            if re.search(pattern, message):
-                contact_info = get_contact_info(
-                    voucher_type=context.get('voucher_type'),
-                    borough=context.get('borough'),
-                    is_discrimination=True,
-                    use_borough_office=True
-                )
-                return True, "discrimination_case", contact_info
+        if (found(_CASE_BASED_ANCHORS) and
+                _CASE_BASED_RE.search(message_lower)):
+            return "discrimination_case"
 
         # Check for assistance-related keywords
-        assistance_keywords = [
-            'help with', 'assistance with', 'having trouble with', 'need help with',
-            'having difficulty with', 'problems with', 'issues with', 'speak with',
-            'talk to someone', 'contact someone', 'get in touch', 'caseworker',
-            'specialist', 'advisor', 'counselor', 'need to speak', 'need to talk',
-            'how do i get in touch', 'how can i speak', 'how can i talk',
-            'housing specialist', 'need assistance with'
-        ]
-        
-        if any(keyword in message.lower() for keyword in assistance_keywords):
+        if found(_ASSISTANCE_KEYWORDS):
             # Don't trigger on simple help requests without context
-            if message.lower().strip() in ['help', 'i need help', 'need help']:
-                return False, None, None
+            if message_lower in ['help', 'i need help', 'need help']:
+                return None
                 
             # Don't trigger on search-related help unless it's a clear request for human assistance
-            if any(word in message.lower() for word in ['find', 'search', 'looking', 'show', 'list']):
-                if not any(phrase in message.lower() for phrase in [
-                    'talk to', 'speak with', 'need someone', 'talk with', 'speak to',
-                    'human', 'person', 'caseworker', 'agent', 'staff', 'specialist',
-                    'having trouble', 'need help with', 'assistance with'
-                ]):
-                    return False, None, None
+            if found(_SEARCH_WORDS):
+                if not found(_HUMAN_ASSISTANCE_PHRASES):
+                    return None
         
-        return False, None, None
+        return self._semantic_reason(message_lower)
+
+    def _semantic_reason(self, message_lower: str) -> Optional[str]:
+        """Classify a message nothing else matched, if the semantic fallback is on"""
+        if self._semantic is None:
+            return None
+        try:
+            return self._semantic.classify(message_lower)
+        except Exception as e:
+            # The model loads on first use; if that fails (e.g. the download
+            # or disk read), keep detecting by keyword rather than raising
+            logger.warning(f"Semantic handoff fallback disabled: {e}")
+            self._semantic = None
+            return None
 
     def format_handoff_message(self, reason: str, contact_info: Dict) -> str:
         """Format the handoff message based on the trigger reason."""
-        
-        # Base message parts
-        messages = {
-            "user_request": """
-I understand you'd like to speak with a human caseworker. I'm happy to connect you with the right person.
-
-**{name}**
-Phone: {phone}
-Email: {email}
-Address: {address}
-Hours: {hours}
-
-I'm still here if you need help drafting a message or have other questions about your housing search.
-""",
-            "discrimination_case": """
-I notice you may be experiencing housing discrimination, which is illegal in NYC. You should speak with a housing specialist right away.
-
-**{name}**
-Phone: {phone}
-Email: {email}
-Address: {address}
-Hours: {hours}
-
-Additionally, you can report housing discrimination:
-- NYC Commission on Human Rights: 212-416-0197
-- NYS Division of Human Rights: 1-888-392-3644
-
-I'm here if you need help documenting what happened or have other questions.
-"""
-        }
-        
-        # Format the appropriate message with contact info
-        formatted_msg = messages[reason].format(**contact_info)
-        
-        # Ensure consistent line endings and spacing
-        formatted_msg = formatted_msg.strip()
-        
-        return formatted_msg
+        # Templates are stripped once at import, so no per-call cleanup is needed
+        return _format_handoff_message(
+            reason, contact_info["name"], contact_info["phone"], contact_info["email"],
+            contact_info["address"], contact_info["hours"]
+        )
 
 def final_answer(response_text: str) -> Dict:
     """Format the final response for the UI."""
     return {
         "response": response_text,
-        "metadata": {
-            "requires_human_handoff": True,
-            "handoff_type": "caseworker",
-            "timestamp": None  # You can add timestamp if needed
-        }
-    } 
\ No newline at end of file
+        "metadata": dict(_HANDOFF_METADATA)
+    }
@@ -2,6 +2,17 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import json
 
+def _listing_id(listing: Dict) -> str:
+    """Derive the shortlist ID for a listing (falls back to its address)."""
+    return str(listing.get("id", listing.get("address", "")))
+
+def _find_item(listing_id: str, app_state: Dict) -> Optional[Dict]:
+    """Return the shortlisted item with the given ID, or None if absent."""
+    return next(
+        (item for item in app_state.get("shortlist", []) if item.get("listing_id") == listing_id),
+        None
+    )
+
 def add_to_shortlist(listing: Dict, app_state: Dict) -> Tuple[Dict, str]:
     """
     Add a listing to the shortlist.
@@ -18,13 +29,12 @@ def add_to_shortlist(listing: Dict, app_state: Dict) -> Tuple[Dict, str]:
         app_state["shortlist"] = []
     
     # Create unique ID for the listing
-    listing_id = str(listing.get("id", listing.get("address", "")))
+    listing_id = _listing_id(listing)
     address = listing.get("address", listing.get("title", "N/A"))
     
     # Check if listing is already in shortlist
-    for item in app_state["shortlist"]:
-        if item.get("listing_id") == listing_id:
-            return app_state, f"Listing '{address}' is already in your shortlist"
+    if _find_item(listing_id, app_state) is not None:
+        return app_state, f"Listing '{address}' is already in your shortlist"
     
     # Create shortlisted item with metadata
     shortlisted_item = {
@@ -124,10 +134,10 @@ def set_priority(listing_id: str, priority: int, app_state: Dict) -> Tuple[Dict,
     if "shortlist" not in app_state:
         return app_state, "Your shortlist is empty"
     
-    for item in app_state["shortlist"]:
-        if item.get("listing_id") == listing_id:
-            item["priority"] = priority
-            return app_state, f"✅ Set priority {priority} for '{item['address']}'"
+    item = _find_item(listing_id, app_state)
+    if item is not None:
+        item["priority"] = priority
+        return app_state, f"✅ Set priority {priority} for '{item['address']}'"
     
     return app_state, "❌ Listing not found in your shortlist"
 
@@ -146,10 +156,10 @@ def add_note(listing_id: str, note: str, app_state: Dict) -> Tuple[Dict, str]:
     if "shortlist" not in app_state:
         return app_state, "Your shortlist is empty"
     
-    for item in app_state["shortlist"]:
-        if item.get("listing_id") == listing_id:
-            item["notes"] = note
-            return app_state, f"✅ Added note to '{item['address']}'"
+    item = _find_item(listing_id, app_state)
+    if item is not None:
+        item["notes"] = note
+        return app_state, f"✅ Added note to '{item['address']}'"
     
     return app_state, "❌ Listing not found in your shortlist"
 
@@ -167,8 +177,7 @@ def is_shortlisted(listing: Dict, app_state: Dict) -> bool:
     if "shortlist" not in app_state:
         return False
     
-    listing_id = str(listing.get("id", listing.get("address", "")))
-    return any(item.get("listing_id") == listing_id for item in app_state["shortlist"])
+    return _find_item(_listing_id(listing), app_state) is not None
 
 def get_shortlist_summary(app_state: Dict) -> str:
     """
@@ -0,0 +1,22 @@
+"""
+Shared pytest fixtures for the handoff test modules.
+"""
+
+import pytest
+from escalation.handoff_detector import HandoffDetector
+
+
+@pytest.fixture(scope="session")
+def detector():
+    """Create one HandoffDetector shared by every handoff test."""
+    handoff_detector = HandoffDetector()
+    # Run one detection and one formatting up front so contact lookups and
+    # other first-call work don't land on whichever test happens to run first
+    _, reason, contact_info = handoff_detector.detect_handoff(
+        "Can I talk to a caseworker?", {"voucher_type": "Section 8", "borough": "Manhattan"}
+    )
+    handoff_detector.format_handoff_message(reason, contact_info)
+    state = dict(vars(handoff_detector))
+    yield handoff_detector
+    # Sharing is only safe while detection leaves the detector untouched
+    assert vars(handoff_detector) == state, "HandoffDetector state changed during the test session"
@@ -0,0 +1,138 @@
+"""
+Shared handoff detection cases for test_handoff.py.
+
+Each detection case is
+(message, voucher_type, borough, should_handoff, expected_reason).
+"""
+
+from types import MappingProxyType
+
+DISCRIMINATION_CASES = (
+    # Direct discrimination
+    ("The landlord said they don't accept Section 8",
+     "Section 8", "Manhattan", True, "discrimination_case"),
+    ("The landlord said they don't take vouchers",
+     "CityFHEPS", "Brooklyn", True, "discrimination_case"),
+    ("Building management refuses to take my CityFHEPS voucher",
+     "CityFHEPS", "Brooklyn", True, "discrimination_case"),
+    ("Broker told me HASA vouchers are not allowed here",
+     "HASA", "Bronx", True, "discrimination_case"),
+    ("Broker told me Section 8 not allowed here",
+     "Section 8", "Manhattan", True, "discrimination_case"),
+    ("Management company refuses HASA clients",
+     "HASA", "Bronx", True, "discrimination_case"),
+
+    # Indirect discrimination
+    ("Every time I mention my voucher, they say the unit was just rented",
+     "Section 8", "Queens", True, "discrimination_case"),
+    ("They keep saying the unit is no longer available when I mention my voucher",
+     "CityFHEPS", "Queens", True, "discrimination_case"),
+    ("They stop responding to my calls after I mention CityFHEPS",
+     "CityFHEPS", "Staten Island", True, "discrimination_case"),
+    ("Every time I mention Section 8, they stop responding to my calls",
+     "Section 8", "Brooklyn", True, "discrimination_case"),
+    ("The agent said they're only looking for working professionals",
+     "HASA", "Manhattan", True, "discrimination_case"),
+    ("They said they prefer working professionals only",
+     "HASA", "Manhattan", True, "discrimination_case"),
+
+    # Complaints combined with other requests
+    ("I need help filing a discrimination complaint and understanding my options",
+     "Section 8", "Manhattan", True, "discrimination_case"),
+    ("Can you help me file a complaint about discrimination and connect me with someone?",
+     "Section 8", "Manhattan", True, "discrimination_case"),
+)
+
+ASSISTANCE_CASES = (
+    # Direct requests
+    ("Can I speak with a housing specialist about my voucher?",
+     "Section 8", "Brooklyn", True, "user_request"),
+    ("Can I speak with a caseworker?",
+     "CityFHEPS", "Brooklyn", True, "user_request"),
+    ("I need help understanding my rights as a voucher holder",
+     "CityFHEPS", "Manhattan", True, "user_request"),
+    ("I need to talk to someone about my voucher",
+     "Section 8", "Manhattan", True, "user_request"),
+    ("How do I get in touch with a caseworker?",
+     "HASA", "Bronx", True, "user_request"),
+    ("How do I get in touch with a housing specialist?",
+     "HASA", "Bronx", True, "user_request"),
+
+    # Complex or multi-part requests
+    ("Can you help me understand my rights and connect me with a specialist?",
+     "CityFHEPS", "Brooklyn", True, "user_request"),
+    ("I've been searching for weeks and need to speak with someone about my application",
+     "HASA", "Queens", True, "user_request"),
+    ("I've been searching for weeks but need help understanding my rights and options",
+     "CityFHEPS", "Brooklyn", True, "user_request"),
+    ("I'm having trouble with my application and need to speak with a specialist",
+     "HASA", "Bronx", True, "user_request"),
+)
+
+NON_HANDOFF_CASES = (
+    ("Can you help me find apartments in Brooklyn?",
+     "Section 8", "Brooklyn", False, None),
+    ("Can you show me apartments in Brooklyn?",
+     "CityFHEPS", "Brooklyn", False, None),
+    ("What's the rent for this apartment?",
+     "CityFHEPS", "Manhattan", False, None),
+    ("What's the maximum rent for Section 8?",
+     "Section 8", "Manhattan", False, None),
+    ("Are there any 2-bedroom units available?",
+     "HASA", "Queens", False, None),
+    ("Are there any available units in the Bronx?",
+     "HASA", "Bronx", False, None),
+    ("Show me apartments near subway stations",
+     "Section 8", "Bronx", False, None),
+    ("Help me find pet-friendly apartments",
+     "CityFHEPS", "Queens", False, None),
+)
+
+EDGE_CASES = (
+    # Empty message
+    ("", "Section 8", "Brooklyn", False, None),
+    # Ambiguous request
+    ("I need help", "CityFHEPS", "Manhattan", False, None),
+    # Emphatic request
+    ("URGENT! Need to speak with someone immediately!!!",
+     "HASA", "Bronx", True, "user_request"),
+    # Implicit discrimination
+    ("The landlord... you know... when I mentioned the voucher...",
+     "Section 8", "Queens", True, "discrimination_case"),
+)
+
+# Each routing case is (voucher_type, borough, is_discrimination, expected_name)
+CONTACT_ROUTING_CASES = (
+    # HASA discrimination cases should go to Housing Works
+    ("HASA", "Brooklyn", True, "Housing Works Legal Team"),
+    # Section 8 discrimination should go to NYC Commission
+    ("Section 8", "Manhattan", True, "NYC Commission on Human Rights"),
+    # Regular inquiries should go to borough offices
+    ("CityFHEPS", "brooklyn", False, "Brooklyn CityFHEPS Office"),
+    # Unknown voucher types should get default HRA
+    (None, None, False, "HRA General Support"),
+)
+
+# Each formatting case is (message, voucher_type, borough, expected_content),
+# with the expected content compared against the lowercased message
+FORMATTING_CASES = (
+    # Discrimination case
+    ("Landlord won't take my voucher",
+     "CityFHEPS", "Brooklyn",
+     ("housing discrimination", "illegal in nyc", "commission on human rights", "division of human rights")),
+    ("The landlord refused my voucher",
+     "Section 8", "Manhattan",
+     ("discrimination", "nyc commission on human rights")),
+    # Regular assistance request
+    ("Need to speak with someone",
+     "Section 8", "Manhattan",
+     ("speak with a human caseworker", "phone", "email", "address")),
+)
+
+# One read-only context per (voucher_type, borough) pair the cases use
+CONTEXTS = {
+    (voucher_type, borough): MappingProxyType({"voucher_type": voucher_type, "borough": borough})
+    for _, voucher_type, borough, *_ in (
+        DISCRIMINATION_CASES + ASSISTANCE_CASES + NON_HANDOFF_CASES + EDGE_CASES + FORMATTING_CASES
+    )
+}
@@ -18,17 +18,142 @@ import sys
 import os
 import time
 import json
+import re
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from io import StringIO
 from contextlib import redirect_stdout, redirect_stderr
 
-# Add the parent directory to the path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add the parent directory to the path (once, even when worker processes
+# re-import this module)
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
 
-# Import test modules
-from test_regex_aggressiveness import TestRegexAggressiveness
-from test_llm_fallback_system import TestLLMFallbackSystem
-from test_chatbot_dynamism import TestChatbotDynamism
+
+# Test suites to run, keyed by their --test-suite name. Classes are referenced
+# by module and class name so each suite is only imported where it runs.
+TEST_SUITES = {
+    'regex': {
+        "name": "Regex Aggressiveness Tests",
+        "description": "Tests to identify overly aggressive regex patterns",
+        "module": "test_regex_aggressiveness",
+        "class_name": "TestRegexAggressiveness",
+        "icon": "🔍"
+    },
+    'llm': {
+        "name": "LLM Fallback System Tests",
+        "description": "Tests for LLM fallback system effectiveness",
+        "module": "test_llm_fallback_system",
+        "class_name": "TestLLMFallbackSystem",
+        "icon": "🧠"
+    },
+    'dynamism': {
+        "name": "Chatbot Dynamism Tests",
+        "description": "Tests for overall chatbot adaptability and dynamism",
+        "module": "test_chatbot_dynamism",
+        "class_name": "TestChatbotDynamism",
+        "icon": "🎭"
+    }
+}
+
+
+class _NullStream:
+    """Write-only sink that discards everything written to it"""
+    
+    def write(self, s):
+        return len(s)
+    
+    def flush(self):
+        pass
+
+
+def _format_pct(rate):
+    """Format a success rate as a percentage, e.g. 0.956 -> '95.6%'
+
+    Rates can be negative when subtest failures outnumber the tests run.
+    """
+    return f"{rate:.1%}"
+
+
+class _CountingResult(unittest.TestResult):
+    """Plain TestResult that records outcomes without any text formatting"""
+
+
+def _format_problems(result):
+    """Failure and error tracebacks of a result, laid out like unittest's"""
+    sections = []
+    for flavour, problems in (('ERROR', result.errors), ('FAIL', result.failures)):
+        for test, traceback_text in problems:
+            sections.append(f"{'=' * 70}\n{flavour}: {test}\n{'-' * 70}\n{traceback_text}")
+    return '\n'.join(sections)
+
+
+def _warm_regex_cache():
+    """Compile the router patterns up front so tests don't pay for it"""
+    try:
+        from enhanced_semantic_router_v2 import EnhancedSemanticRouterV2, _compiled
+    except ImportError:
+        return
+    
+    # Building a router compiles its combined intent scanners
+    router = EnhancedSemanticRouterV2()
+    for patterns in router.parameter_patterns.values():
+        for pattern in patterns:
+            _compiled(pattern, re.IGNORECASE)
+
+
+def _run_suite_worker(module_name, class_name, verbose):
+    """Run one TestCase class and return a picklable summary of the result.
+
+    The class is resolved by name so the call can be shipped to a worker
+    process; TestResult objects themselves hold test instances and tracebacks
+    and are not sent back.
+    """
+    test_class = getattr(__import__(module_name), class_name)
+    _warm_regex_cache()
+    suite = unittest.TestLoader().loadTestsFromTestCase(test_class)
+    
+    error_buffer = StringIO()
+    
+    if verbose:
+        # Capture the full runner transcript for the detailed output
+        output_buffer = StringIO()
+        with redirect_stdout(output_buffer), redirect_stderr(error_buffer):
+            runner = unittest.TextTestRunner(
+                stream=output_buffer,
+                verbosity=2,
+                buffer=True
+            )
+            result = runner.run(suite)
+        output = output_buffer.getvalue()
+    else:
+        # Skip the text runner and discard anything the tests print, but keep
+        # the failure and error tracebacks for the detailed report
+        result = _CountingResult()
+        with redirect_stdout(_NullStream()), redirect_stderr(error_buffer):
+            suite.run(result)
+        output = _format_problems(result)
+    
+    return {
+        'tests_run': result.testsRun,
+        'failures': len(result.failures),
+        'errors': len(result.errors),
+        'output': output,
+        'error_output': error_buffer.getvalue(),
+    }
+
+
+def _suite_error_result(error_text):
+    """Result summary for a suite whose worker raised instead of returning"""
+    return {
+        'tests_run': 0,
+        'failures': 0,
+        'errors': 1,
+        'output': error_text,
+        'error_output': error_text,
+    }
 
 
 class ComprehensiveTestRunner:
@@ -37,8 +162,15 @@ class ComprehensiveTestRunner:
     def __init__(self, verbose=False):
         self.verbose = verbose
         self.results = {}
-        self.start_time = None
-        self.end_time = None
+        self.start_ns = None
+        self.end_ns = None
+        self.duration_s = 0.0
+        self.total_tests = 0
+        self.total_failures = 0
+        self.total_errors = 0
+        self.overall_success_rate = 0
+        self._out = []
+        self._report_file = None
         
     def run_all_tests(self):
         """Run all comprehensive test suites"""
@@ -48,80 +180,78 @@ class ComprehensiveTestRunner:
         print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print()
         
-        self.start_time = time.time()
-        
-        # Test suites to run
-        test_suites = [
-            {
-                "name": "Regex Aggressiveness Tests",
-                "description": "Tests to identify overly aggressive regex patterns",
-                "test_class": TestRegexAggressiveness,
-                "icon": "🔍"
-            },
-            {
-                "name": "LLM Fallback System Tests", 
-                "description": "Tests for LLM fallback system effectiveness",
-                "test_class": TestLLMFallbackSystem,
-                "icon": "🧠"
-            },
-            {
-                "name": "Chatbot Dynamism Tests",
-                "description": "Tests for overall chatbot adaptability and dynamism",
-                "test_class": TestChatbotDynamism,
-                "icon": "🎭"
-            }
-        ]
-        
-        # Run each test suite
-        for suite_info in test_suites:
-            self._run_test_suite(suite_info)
-        
-        self.end_time = time.time()
-        
-        # Generate comprehensive report
-        self._generate_report()
+        self.start_ns = time.perf_counter_ns()
+        self._open_detailed_report()
+        
+        try:
+            # Suites share no state, so run them in separate worker processes;
+            # results are reported in TEST_SUITES order, each as soon as it
+            # and the suites before it have finished
+            with ProcessPoolExecutor(max_workers=len(TEST_SUITES)) as executor:
+                futures = [
+                    (suite_info, executor.submit(
+                        _run_suite_worker,
+                        suite_info['module'],
+                        suite_info['class_name'],
+                        self.verbose
+                    ))
+                    for suite_info in TEST_SUITES.values()
+                ]
+                for suite_info, future in futures:
+                    try:
+                        raw = future.result()
+                    except Exception:
+                        # A suite that can't be imported or run is reported as
+                        # an error instead of aborting the other suites
+                        raw = _suite_error_result(traceback.format_exc())
+                    self._record_suite_result(suite_info, raw)
+            
+            self.end_ns = time.perf_counter_ns()
+            self.duration_s = (self.end_ns - self.start_ns) / 1e9
+            
+            # Generate comprehensive report
+            self._generate_report()
+        finally:
+            # Leave valid JSON behind even if the run itself fails
+            if self._report_file is not None:
+                self._close_detailed_report()
         
     def _run_test_suite(self, suite_info):
-        """Run a single test suite"""
+        """Run a single test suite in the current process"""
+        
+        raw = _run_suite_worker(suite_info['module'], suite_info['class_name'], self.verbose)
+        self._record_suite_result(suite_info, raw)
+    
+    def _record_suite_result(self, suite_info, raw):
+        """Store a suite's result summary and print it"""
         
         print(f"{suite_info['icon']} {suite_info['name']}")
         print("-" * 60)
         print(f"Description: {suite_info['description']}")
         print()
         
-        # Create test suite
-        suite = unittest.TestLoader().loadTestsFromTestCase(suite_info['test_class'])
-        
-        # Capture output
-        output_buffer = StringIO()
-        error_buffer = StringIO()
-        
-        # Run tests with custom result handler
-        with redirect_stdout(output_buffer), redirect_stderr(error_buffer):
-            runner = unittest.TextTestRunner(
-                stream=output_buffer,
-                verbosity=2 if self.verbose else 1,
-                buffer=True
-            )
-            result = runner.run(suite)
+        tests_run = raw['tests_run']
+        success_rate = (tests_run - raw['failures'] - raw['errors']) / tests_run if tests_run > 0 else 0
         
         # Store results
         self.results[suite_info['name']] = {
-            'result': result,
-            'output': output_buffer.getvalue(),
-            'errors': error_buffer.getvalue(),
-            'tests_run': result.testsRun,
-            'failures': len(result.failures),
-            'errors': len(result.errors),
-            'success_rate': (result.testsRun - len(result.failures) - len(result.errors)) / result.testsRun if result.testsRun > 0 else 0
+            'output': raw['output'],
+            'error_output': raw['error_output'],
+            'tests_run': tests_run,
+            'failures': raw['failures'],
+            'errors': raw['errors'],
+            'success_rate': success_rate
         }
         
-        # Print summary
         suite_result = self.results[suite_info['name']]
+        if self._report_file is not None:
+            self._write_suite_report(suite_info['name'], suite_result)
+        
+        # Print summary
         print(f"Tests Run: {suite_result['tests_run']}")
         print(f"Failures: {suite_result['failures']}")
         print(f"Errors: {suite_result['errors']}")
-        print(f"Success Rate: {suite_result['success_rate']:.1%}")
+        print(f"Success Rate: {_format_pct(suite_result['success_rate'])}")
         
         if suite_result['failures'] > 0 or suite_result['errors'] > 0:
             print("❌ Some tests failed")
@@ -136,40 +266,43 @@ class ComprehensiveTestRunner:
             print(suite_result['output'])
             print()
     
+    def _emit(self, line=''):
+        """Queue a report line; the report is written out in one go"""
+        self._out.append(line)
+    
     def _generate_report(self):
         """Generate comprehensive test report"""
         
-        print("📊 COMPREHENSIVE TEST REPORT")
-        print("=" * 80)
+        self._out = []
+        
+        self._emit("📊 COMPREHENSIVE TEST REPORT")
+        self._emit("=" * 80)
         
-        total_duration = self.end_time - self.start_time
+        total_duration = self.duration_s
         
         # Overall statistics
-        total_tests = sum(r['tests_run'] for r in self.results.values())
-        total_failures = sum(r['failures'] for r in self.results.values())
-        total_errors = sum(r['errors'] for r in self.results.values())
-        overall_success_rate = (total_tests - total_failures - total_errors) / total_tests if total_tests > 0 else 0
-        
-        print(f"📈 OVERALL STATISTICS")
-        print(f"  Total Test Duration: {total_duration:.2f} seconds")
-        print(f"  Total Tests Run: {total_tests}")
-        print(f"  Total Failures: {total_failures}")
-        print(f"  Total Errors: {total_errors}")
-        print(f"  Overall Success Rate: {overall_success_rate:.1%}")
-        print()
+        self._compute_totals()
+        
+        self._emit(f"📈 OVERALL STATISTICS")
+        self._emit(f"  Total Test Duration: {total_duration:.2f} seconds")
+        self._emit(f"  Total Tests Run: {self.total_tests}")
+        self._emit(f"  Total Failures: {self.total_failures}")
+        self._emit(f"  Total Errors: {self.total_errors}")
+        self._emit(f"  Overall Success Rate: {_format_pct(self.overall_success_rate)}")
+        self._emit()
         
         # Per-suite breakdown
-        print(f"🔍 SUITE-BY-SUITE BREAKDOWN")
+        self._emit(f"🔍 SUITE-BY-SUITE BREAKDOWN")
         for suite_name, suite_result in self.results.items():
             status = "✅ PASSED" if suite_result['failures'] == 0 and suite_result['errors'] == 0 else "❌ FAILED"
-            print(f"  {suite_name}: {status}")
-            print(f"    Tests: {suite_result['tests_run']}")
-            print(f"    Success Rate: {suite_result['success_rate']:.1%}")
+            self._emit(f"  {suite_name}: {status}")
+            self._emit(f"    Tests: {suite_result['tests_run']}")
+            self._emit(f"    Success Rate: {_format_pct(suite_result['success_rate'])}")
             if suite_result['failures'] > 0:
-                print(f"    Failures: {suite_result['failures']}")
+                self._emit(f"    Failures: {suite_result['failures']}")
             if suite_result['errors'] > 0:
-                print(f"    Errors: {suite_result['errors']}")
-            print()
+                self._emit(f"    Errors: {suite_result['errors']}")
+            self._emit()
         
         # Specific findings and recommendations
         self._generate_findings_and_recommendations()
@@ -177,107 +310,154 @@ class ComprehensiveTestRunner:
         # Save detailed report to file
         self._save_detailed_report()
         
+        sys.stdout.write('\n'.join(self._out) + '\n')
+        sys.stdout.flush()
+        
+    def _compute_totals(self):
+        """Aggregate test counts across all suites in a single pass"""
+        
+        total_tests = total_failures = total_errors = 0
+        for r in self.results.values():
+            total_tests += r['tests_run']
+            total_failures += r['failures']
+            total_errors += r['errors']
+        
+        self.total_tests = total_tests
+        self.total_failures = total_failures
+        self.total_errors = total_errors
+        self.overall_success_rate = (total_tests - total_failures - total_errors) / total_tests if total_tests > 0 else 0
+        
     def _generate_findings_and_recommendations(self):
         """Generate specific findings and recommendations"""
         
-        print(f"🔍 KEY FINDINGS AND RECOMMENDATIONS")
-        print("-" * 60)
+        self._emit(f"🔍 KEY FINDINGS AND RECOMMENDATIONS")
+        self._emit("-" * 60)
         
         # Analyze regex aggressiveness results
         regex_results = self.results.get("Regex Aggressiveness Tests")
         if regex_results:
             if regex_results['success_rate'] < 0.8:
-                print("⚠️  REGEX AGGRESSIVENESS ISSUES DETECTED")
-                print("   - Some regex patterns may be too aggressive")
-                print("   - Consider making patterns more specific")
-                print("   - Review false positive cases")
+                self._emit("⚠️  REGEX AGGRESSIVENESS ISSUES DETECTED")
+                self._emit("   - Some regex patterns may be too aggressive")
+                self._emit("   - Consider making patterns more specific")
+                self._emit("   - Review false positive cases")
             else:
-                print("✅ REGEX PATTERNS APPEAR WELL-TUNED")
-                print("   - Low false positive rate detected")
-                print("   - Patterns are appropriately specific")
-            print()
+                self._emit("✅ REGEX PATTERNS APPEAR WELL-TUNED")
+                self._emit("   - Low false positive rate detected")
+                self._emit("   - Patterns are appropriately specific")
+            self._emit()
         
         # Analyze LLM fallback results
         llm_results = self.results.get("LLM Fallback System Tests")
         if llm_results:
             if llm_results['success_rate'] < 0.9:
-                print("⚠️  LLM FALLBACK SYSTEM NEEDS ATTENTION")
-                print("   - Some edge cases not handled properly")
-                print("   - Consider improving error handling")
-                print("   - Review multilingual support")
+                self._emit("⚠️  LLM FALLBACK SYSTEM NEEDS ATTENTION")
+                self._emit("   - Some edge cases not handled properly")
+                self._emit("   - Consider improving error handling")
+                self._emit("   - Review multilingual support")
             else:
-                print("✅ LLM FALLBACK SYSTEM PERFORMING WELL")
-                print("   - Good error handling and recovery")
-                print("   - Effective multilingual support")
-            print()
+                self._emit("✅ LLM FALLBACK SYSTEM PERFORMING WELL")
+                self._emit("   - Good error handling and recovery")
+                self._emit("   - Effective multilingual support")
+            self._emit()
         
         # Analyze dynamism results
         dynamism_results = self.results.get("Chatbot Dynamism Tests")
         if dynamism_results:
             if dynamism_results['success_rate'] < 0.85:
-                print("⚠️  CHATBOT DYNAMISM COULD BE IMPROVED")
-                print("   - Context handling may need enhancement")
-                print("   - Consider improving conversation flow")
-                print("   - Review adaptive response mechanisms")
+                self._emit("⚠️  CHATBOT DYNAMISM COULD BE IMPROVED")
+                self._emit("   - Context handling may need enhancement")
+                self._emit("   - Consider improving conversation flow")
+                self._emit("   - Review adaptive response mechanisms")
             else:
-                print("✅ CHATBOT SHOWS GOOD DYNAMISM")
-                print("   - Effective context management")
-                print("   - Good conversation flow adaptation")
-            print()
+                self._emit("✅ CHATBOT SHOWS GOOD DYNAMISM")
+                self._emit("   - Effective context management")
+                self._emit("   - Good conversation flow adaptation")
+            self._emit()
         
         # Overall system health
-        total_tests = sum(r['tests_run'] for r in self.results.values())
-        total_failures = sum(r['failures'] for r in self.results.values())
-        total_errors = sum(r['errors'] for r in self.results.values())
-        
-        if total_tests > 0:
-            overall_success_rate = (total_tests - total_failures - total_errors) / total_tests
+        if self.total_tests > 0:
+            overall_success_rate = self.overall_success_rate
             if overall_success_rate >= 0.9:
-                print("🎉 OVERALL SYSTEM HEALTH: EXCELLENT")
-                print("   - System is performing very well")
-                print("   - Minor optimizations may still be beneficial")
+                self._emit("🎉 OVERALL SYSTEM HEALTH: EXCELLENT")
+                self._emit("   - System is performing very well")
+                self._emit("   - Minor optimizations may still be beneficial")
             elif overall_success_rate >= 0.8:
-                print("👍 OVERALL SYSTEM HEALTH: GOOD")
-                print("   - System is performing well")
-                print("   - Some areas for improvement identified")
+                self._emit("👍 OVERALL SYSTEM HEALTH: GOOD")
+                self._emit("   - System is performing well")
+                self._emit("   - Some areas for improvement identified")
             elif overall_success_rate >= 0.7:
-                print("⚠️  OVERALL SYSTEM HEALTH: NEEDS ATTENTION")
-                print("   - Several issues need to be addressed")
-                print("   - Consider prioritizing fixes")
+                self._emit("⚠️  OVERALL SYSTEM HEALTH: NEEDS ATTENTION")
+                self._emit("   - Several issues need to be addressed")
+                self._emit("   - Consider prioritizing fixes")
             else:
-                print("🚨 OVERALL SYSTEM HEALTH: CRITICAL")
-                print("   - Significant issues detected")
-                print("   - Immediate attention required")
+                self._emit("🚨 OVERALL SYSTEM HEALTH: CRITICAL")
+                self._emit("   - Significant issues detected")
+                self._emit("   - Immediate attention required")
         
-        print()
+        self._emit()
+        
+    def _open_detailed_report(self):
+        """Create the JSON report file and write its opening skeleton
         
+        Suite entries are appended as each suite finishes, so a crash part-way
+        through still leaves the completed suites on disk.
+        """
+        
+        now = datetime.now()
+        self.report_filename = f"test_report_{now.strftime('%Y%m%d_%H%M%S')}.json"
+        
+        # Pretty-print only for verbose runs; otherwise emit compact UTF-8
+        if self.verbose:
+            self._json_opts = {'ensure_ascii': False, 'indent': 2}
+            self._nl, self._pad, self._sep = '\n', '  ', ': '
+        else:
+            self._json_opts = {'ensure_ascii': False, 'separators': (',', ':')}
+            self._nl, self._pad, self._sep = '', '', ':'
+        nl, pad, sep = self._nl, self._pad, self._sep
+        
+        self._report_file = open(self.report_filename, 'w', encoding='utf-8', buffering=65536)
+        self._report_entries = 0
+        self._report_file.write('{' + nl)
+        self._report_file.write(f'{pad}"timestamp"{sep}{json.dumps(now.isoformat())},{nl}')
+        self._report_file.write(f'{pad}"results"{sep}{{')
+        self._report_file.flush()
+    
+    def _write_suite_report(self, suite_name, suite_result):
+        """Append one suite's entry to the open JSON report and flush it"""
+        
+        f = self._report_file
+        nl, pad, sep = self._nl, self._pad, self._sep
+        f.write(',' + nl if self._report_entries else nl)
+        f.write(f'{pad * 2}{json.dumps(suite_name, ensure_ascii=False)}{sep}')
+        json.dump({
+            'tests_run': suite_result['tests_run'],
+            'failures': suite_result['failures'],
+            'errors': suite_result['errors'],
+            'success_rate': suite_result['success_rate'],
+            'output': suite_result['output'][:1000] if suite_result['output'] else "",  # Truncate for size
+        }, f, **self._json_opts)
+        f.flush()
+        self._report_entries += 1
+    
+    def _close_detailed_report(self):
+        """Close the JSON report with the total run duration"""
+        
+        nl, pad, sep = self._nl, self._pad, self._sep
+        try:
+            self._report_file.write(f'{nl}{pad}}},{nl}')
+            self._report_file.write(f'{pad}"duration"{sep}{json.dumps(self.duration_s)}{nl}}}\n')
+        finally:
+            self._report_file.close()
+            self._report_file = None
+    
     def _save_detailed_report(self):
-        """Save detailed report to JSON file"""
+        """Finish the JSON report and note where it was saved"""
         
-        report_data = {
-            'timestamp': datetime.now().isoformat(),
-            'duration': self.end_time - self.start_time,
-            'results': {}
-        }
+        self._close_detailed_report()
         
-        # Convert results to serializable format
-        for suite_name, suite_result in self.results.items():
-            report_data['results'][suite_name] = {
-                'tests_run': suite_result['tests_run'],
-                'failures': suite_result['failures'],
-                'errors': suite_result['errors'],
-                'success_rate': suite_result['success_rate'],
-                'output': suite_result['output'][:1000] if suite_result['output'] else "",  # Truncate for size
-            }
-        
-        # Save to file
-        report_filename = f"test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(report_filename, 'w') as f:
-            json.dump(report_data, f, indent=2)
-        
-        print(f"📄 Detailed report saved to: {report_filename}")
-        print()
-
+        self._emit(f"📄 Detailed report saved to: {self.report_filename}")
+        self._emit()
 
 def main():
     """Main function to run comprehensive tests"""
@@ -288,7 +468,7 @@ def main():
     parser.add_argument('--verbose', '-v', action='store_true', 
                        help='Enable verbose output')
     parser.add_argument('--test-suite', '-t', 
-                       choices=['regex', 'llm', 'dynamism', 'all'],
+                       choices=[*TEST_SUITES, 'all'],
                        default='all',
                        help='Specific test suite to run')
     
@@ -300,25 +480,8 @@ def main():
     if args.test_suite == 'all':
         runner.run_all_tests()
     else:
-        # Run specific test suite
-        suite_map = {
-            'regex': TestRegexAggressiveness,
-            'llm': TestLLMFallbackSystem,
-            'dynamism': TestChatbotDynamism
-        }
-        
-        if args.test_suite in suite_map:
-            suite_info = {
-                'name': f"{args.test_suite.title()} Tests",
-                'description': f"Running {args.test_suite} tests only",
-                'test_class': suite_map[args.test_suite],
-                'icon': '🔍'
-            }
-            runner._run_test_suite(suite_info)
-        else:
-            print(f"Unknown test suite: {args.test_suite}")
-            sys.exit(1)
-
+        # Run specific test suite; only the selected test module gets imported
+        runner._run_test_suite(TEST_SUITES[args.test_suite])
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
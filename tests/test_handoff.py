@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Handoff detection scenarios and the responses they produce.
+Tests various types of user inquiries and verifies correct responses.
+"""
+
+import pytest
+from escalation.contact_directory import get_contact_info
+from handoff_cases import (
+    DISCRIMINATION_CASES, ASSISTANCE_CASES, NON_HANDOFF_CASES, EDGE_CASES,
+    CONTACT_ROUTING_CASES, FORMATTING_CASES, CONTEXTS
+)
+
+CASE_PARAMS = "message,voucher_type,borough,should_handoff,expected_reason"
+
+# Bold contact name and field labels every formatted message contains
+FORMAT_MARKERS = ("**", "Phone:", "Email:", "Address:")
+
+
+def _case_ids(cases):
+    """Readable test IDs from each case's message."""
+    return [message[:40] or "empty" for message, *_ in cases]
+
+
+# Every detection case, with its group in the test ID
+DETECTION_CASES = [
+    pytest.param(*case, id=f"{group}-{case_id}")
+    for group, cases in (
+        ("discrimination", DISCRIMINATION_CASES),
+        ("assistance", ASSISTANCE_CASES),
+        ("non_handoff", NON_HANDOFF_CASES),
+        ("edge", EDGE_CASES),
+    )
+    for case, case_id in zip(cases, _case_ids(cases))
+]
+
+
+class TestHandoff:
+    """Test handoff decisions, contact routing and response formatting."""
+
+    @pytest.mark.parametrize(CASE_PARAMS, DETECTION_CASES)
+    def test_detect_handoff(self, detector, message, voucher_type, borough, should_handoff, expected_reason):
+        """Test the handoff decision, reason and contact info for each case."""
+        context = CONTEXTS[voucher_type, borough]
+        needs_handoff, reason, contact_info = detector.detect_handoff(message, context)
+
+        assert (needs_handoff, reason) == (should_handoff, expected_reason), message
+        if should_handoff:
+            assert contact_info is not None, message
+            assert contact_info.keys() >= {"name", "phone", "email"}, message
+
+    def test_batch_matches_single_detection(self, detector):
+        """Test that one batch call over every case matches per-message detection."""
+        cases = DISCRIMINATION_CASES + ASSISTANCE_CASES + NON_HANDOFF_CASES + EDGE_CASES
+        contexts = [CONTEXTS[voucher_type, borough] for _, voucher_type, borough, *_ in cases]
+        results = detector.detect_handoff_batch([message for message, *_ in cases], contexts)
+
+        assert len(results) == len(cases)
+        differing = [
+            message for (message, *_), context, result in zip(cases, contexts, results)
+            if result != detector.detect_handoff(message, context)
+        ]
+        assert not differing, f"Batch results differ for: {differing}"
+
+    def test_check_only(self, detector):
+        """Test that one check_only call flags exactly the cases needing handoff."""
+        cases = DISCRIMINATION_CASES + ASSISTANCE_CASES + NON_HANDOFF_CASES + EDGE_CASES
+        flags = detector.check_only([message for message, *_ in cases])
+
+        assert len(flags) == len(cases)
+        wrong = [case[0] for case, flag in zip(cases, flags) if flag != case[3]]
+        assert not wrong, f"check_only got the wrong decision for: {wrong}"
+
+    @pytest.mark.parametrize("voucher_type,borough,is_discrimination,expected_name", CONTACT_ROUTING_CASES)
+    def test_contact_routing(self, voucher_type, borough, is_discrimination, expected_name):
+        """Test that contacts are routed correctly based on scenario."""
+        contact_info = get_contact_info(
+            voucher_type=voucher_type,
+            borough=borough,
+            is_discrimination=is_discrimination
+        )
+        assert contact_info["name"] == expected_name
+
+    @pytest.mark.parametrize("message,voucher_type,borough,expected_content", FORMATTING_CASES, ids=_case_ids(FORMATTING_CASES))
+    def test_message_formatting(self, detector, message, voucher_type, borough, expected_content):
+        """Test that handoff messages are properly formatted for different scenarios."""
+        context = CONTEXTS[voucher_type, borough]
+        needs_handoff, reason, contact_info = detector.detect_handoff(message, context)
+        assert needs_handoff is True
+
+        formatted_msg = detector.format_handoff_message(reason, contact_info)
+
+        # Verify message structure
+        missing = [marker for marker in FORMAT_MARKERS if marker not in formatted_msg]
+        assert not missing, f"Formatted message is missing {missing}"
+
+        formatted_lower = formatted_msg.lower()
+        missing = [content for content in expected_content if content not in formatted_lower]
+        assert not missing, f"Formatted message is missing {missing}"
+
+        # Verify contact info is included
+        missing = [key for key in ("phone", "email", "address") if contact_info[key] not in formatted_msg]
+        assert not missing, f"Formatted message is missing contact {missing}"
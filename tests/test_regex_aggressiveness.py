@@ -7,6 +7,7 @@ the VoucherBot application to identify overly aggressive matching behavior
 that could lead to false positives and incorrect intent classification.
 """
 
+import dataclasses
 import unittest
 import sys
 import os
@@ -426,6 +427,42 @@ class TestRegexAggressiveness(unittest.TestCase):
                     self.fail(f"Edge case caused exception: '{query}' -> {e}")
                 print()
 
+    def test_whitespace_padding_keeps_parameters(self):
+        """Test that whitespace padding doesn't hide parameters from extraction"""
+        
+        padded_queries = [
+            ("leading spaces", " " * 600 + "2 bedroom in Brooklyn under $2500"),
+            ("internal newlines", "2 bedroom" + "\n" * 600 + "in Brooklyn under $2500"),
+            ("internal tabs", "2 bedroom in" + " \t" * 300 + "Brooklyn under $2500"),
+        ]
+        
+        for padding, query in padded_queries:
+            with self.subTest(padding=padding):
+                params = self.router_v2.extract_parameters(query)
+                self.assertEqual(params.get("borough"), "brooklyn")
+                self.assertEqual(params.get("bedrooms"), 2)
+                self.assertEqual(params.get("max_rent"), 2500)
+
+    def test_shared_pattern_tables_are_read_only(self):
+        """Test that one router can't change the pattern tables every router shares"""
+        
+        patterns = self.router_v2.parameter_patterns
+        with self.assertRaises(TypeError):
+            patterns["borough"] = ["x"]
+        with self.assertRaises(AttributeError):
+            patterns["borough"].append("x")
+        with self.assertRaises(TypeError):
+            self.router_v2.intent_patterns[Intent.WHAT_IF] = None
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            self.router_v2.intent_patterns[Intent.WHAT_IF].patterns = ()
+        with self.assertRaises(AttributeError):
+            self.router_v2.intent_patterns[Intent.WHAT_IF].patterns.append("x")
+        
+        self.assertEqual(
+            EnhancedSemanticRouterV2().extract_parameters("find me a place in queens"),
+            {"borough": "queens"}
+        )
+
     def test_performance_with_complex_queries(self):
         """Test performance with complex and nested queries"""
         
@@ -0,0 +1,16 @@
+"""
+Shared verbose-output switch for test_llm_fallback_system.py and
+test_chatbot_dynamism.py.
+
+Per-scenario logging is off by default; set VOUCHERBOT_TEST_VERBOSE=1 to see it.
+"""
+
+import os
+
+VERBOSE = os.environ.get("VOUCHERBOT_TEST_VERBOSE") == "1"
+
+
+def verbose_print(*args, **kwargs):
+    """print() only when verbose test output is enabled"""
+    if VERBOSE:
+        print(*args, **kwargs)